@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+# Token bucket per client, in units of predict_proba calls
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "50"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "500"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# Header identifying the client behind a trusted proxy (e.g. X-Forwarded-For)
+RATE_LIMIT_CLIENT_HEADER = os.getenv("RATE_LIMIT_CLIENT_HEADER", "")
+
+# Concurrent CPU-heavy requests (what-if sweeps, recommendations) and how
+# many may wait for a slot before new ones are shed
+HEAVY_MAX_CONCURRENCY = int(os.getenv("HEAVY_MAX_CONCURRENCY", str(max(1, (os.cpu_count() or 2) - 1))))
+HEAVY_MAX_QUEUE = int(os.getenv("HEAVY_MAX_QUEUE", "8"))
+HEAVY_QUEUE_TIMEOUT = float(os.getenv("HEAVY_QUEUE_TIMEOUT", "5"))
+
+MAX_WHAT_IF_STEPS = int(os.getenv("MAX_WHAT_IF_STEPS", "200"))
+# Worst-case predict_proba calls made by LoanAnalytics.get_recommendations
+RECOMMENDATIONS_COST = float(os.getenv("RECOMMENDATIONS_COST", "230"))
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate tokens per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, cost):
+        """Consume cost tokens, returning (admitted, seconds until enough tokens)"""
+        self._refill(time.monotonic())
+        if cost > self.capacity:
+            return False, None
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / self.rate
+
+    def refund(self, cost):
+        self.tokens = min(self.capacity, self.tokens + cost)
+
+
+class RateLimiter:
+    """Per-client token buckets, evicting the least recently seen clients"""
+
+    def __init__(self, rate=RATE_LIMIT_RATE, capacity=RATE_LIMIT_BURST, max_clients=RATE_LIMIT_MAX_CLIENTS):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, client):
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.capacity)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket
+
+    def try_consume(self, client, cost):
+        with self._lock:
+            return self._bucket(client).try_consume(cost)
+
+    def refund(self, client, cost):
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is not None:
+                bucket.refund(cost)
+
+    def client_count(self):
+        with self._lock:
+            return len(self._buckets)
+
+
+class ConcurrencyLimiter:
+    """Bounds concurrent requests with a bounded wait queue.
+
+    Requests beyond max_concurrency wait for a slot; once max_queue requests
+    are already waiting, or a wait exceeds timeout, the request is shed.
+    """
+
+    def __init__(self, max_concurrency, max_queue, timeout):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            if self.active < self.max_concurrency and self.queued == 0:
+                self.active += 1
+                return True
+            if self.queued >= self.max_queue:
+                self.rejected_queue_full += 1
+                return False
+
+            self.queued += 1
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: self.active < self.max_concurrency, timeout=self.timeout
+                )
+            finally:
+                self.queued -= 1
+            if not admitted:
+                self.rejected_timeout += 1
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "active": self.active,
+                "queued": self.queued,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "rejected_queue_full": self.rejected_queue_full,
+                "rejected_timeout": self.rejected_timeout
+            }
+
+
+class AdmissionController:
+    """Rate limiting, cost accounting and load shedding for API endpoints"""
+
+    def __init__(self):
+        self.rate_limiter = RateLimiter()
+        self.pools = {
+            "heavy": ConcurrencyLimiter(HEAVY_MAX_CONCURRENCY, HEAVY_MAX_QUEUE, HEAVY_QUEUE_TIMEOUT)
+        }
+        self._endpoint_stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, endpoint, outcome, cost=0):
+        with self._lock:
+            stats = self._endpoint_stats.setdefault(endpoint, {
+                "admitted": 0, "rate_limited": 0, "shed": 0, "refunded": 0, "cost_admitted": 0.0
+            })
+            stats[outcome] += 1
+            if outcome == "admitted":
+                stats["cost_admitted"] += cost
+            elif outcome == "refunded":
+                stats["cost_admitted"] -= cost
+
+    @staticmethod
+    def client_id():
+        if RATE_LIMIT_CLIENT_HEADER:
+            forwarded = request.headers.get(RATE_LIMIT_CLIENT_HEADER)
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.remote_addr or "unknown"
+
+    def admit(self, cost=1, pool=None):
+        """Decorator admitting a request by client rate limit and pool capacity.
+
+        cost is a number or a callable computing it from the request; it is
+        charged against the client's token bucket and refunded if the request
+        is shed or the view rejects it with a 4xx. Rate-limited requests get a
+        429, requests shed by a full or slow pool get a 503, both with
+        Retry-After.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                endpoint = request.endpoint
+                request_cost = cost() if callable(cost) else cost
+                client = self.client_id()
+
+                admitted, retry_after = self.rate_limiter.try_consume(client, request_cost)
+                if not admitted:
+                    self._count(endpoint, "rate_limited")
+                    if retry_after is None:
+                        return jsonify({"error": f"Request cost {request_cost:g} exceeds the rate limit burst"}), 429
+                    response = jsonify({"error": "Rate limit exceeded", "retry_after": round(retry_after, 2)})
+                    response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+                    return response, 429
+
+                limiter = self.pools.get(pool)
+                if limiter is not None and not limiter.acquire():
+                    self.rate_limiter.refund(client, request_cost)
+                    self._count(endpoint, "shed")
+                    response = jsonify({"error": "Server is busy, try again later"})
+                    response.headers["Retry-After"] = str(max(1, int(limiter.timeout)))
+                    return response, 503
+
+                self._count(endpoint, "admitted", request_cost)
+                response = None
+                try:
+                    response = make_response(view(*args, **kwargs))
+                    # Invalid requests never reach the model, so they cost nothing
+                    if 400 <= response.status_code < 500:
+                        self.rate_limiter.refund(client, request_cost)
+                        self._count(endpoint, "refunded", request_cost)
+                    return response
+                finally:
+                    if limiter is not None:
+                        # Streamed responses keep their slot until the stream closes
+                        if getattr(response, "is_streamed", False):
+                            response.call_on_close(limiter.release)
+                        else:
+                            limiter.release()
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self._endpoint_stats.items()}
+        return {
+            "rate_limit": {
+                "rate": self.rate_limiter.rate,
+                "burst": self.rate_limiter.capacity,
+                "clients": self.rate_limiter.client_count()
+            },
+            "pools": {name: limiter.stats() for name, limiter in self.pools.items()},
+            "endpoints": endpoints
+        }
+
+
+def what_if_cost():
+    """One predict_proba call per sweep point"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        # Left for the view to reject
+        data = {}
+    try:
+        steps = int(data.get('steps', 10))
+    except (TypeError, ValueError):
+        steps = 10
+    return max(1, min(steps, MAX_WHAT_IF_STEPS) + 1)
@@ -140,22 +140,24 @@ class LoanAnalytics:
         
         return best_term if best_prob >= target_probability else None
     
-    def what_if_analysis(self, input_data, feature_name, min_val, max_val, steps=10):
-        """Perform what-if analysis for a specific feature"""
-        results = []
-        original_value = input_data[feature_name].iloc[0]
-        
+    def iter_what_if(self, input_data, feature_name, min_val, max_val, steps=10):
+        """Yield what-if sweep points one at a time as they are scored"""
         for i in range(steps + 1):
             test_value = min_val + (max_val - min_val) * i / steps
             test_data = input_data.copy()
             test_data[feature_name] = test_value
             
             prob = self.model.predict_proba(test_data)[0][1]
-            results.append({
+            yield {
                 "value": float(test_value),
                 "probability": float(prob),
                 "status": "Approved" if prob >= 0.5 else "Rejected"
-            })
+            }
+    
+    def what_if_analysis(self, input_data, feature_name, min_val, max_val, steps=10):
+        """Perform what-if analysis for a specific feature"""
+        original_value = input_data[feature_name].iloc[0]
+        results = list(self.iter_what_if(input_data, feature_name, min_val, max_val, steps))
         
         return {
             "feature": feature_name,
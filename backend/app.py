@@ -1,24 +1,40 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import pandas as pd
 import joblib
 import os
-import pymysql
+import time
 from datetime import datetime
-from db.db_config import MYSQL_CONFIG
+from db.storage import create_storage
 from analytics import LoanAnalytics
+from admission import AdmissionController, what_if_cost, MAX_WHAT_IF_STEPS, RECOMMENDATIONS_COST
+from monitoring import DriftMonitor
+from shadow import ShadowScorer
+from scenarios import ScenarioEngine
+from json_provider import FastJSONProvider, to_columnar
+from http_cache import (
+    ArtifactCache, file_digest, serialize, cached_response, artifact_response,
+    not_modified, HISTORY_CACHE_CONTROL
+)
 import json
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
 # Load model and analytics
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "model", "loan_approval_pipeline.pkl")
 FEATURE_IMPORTANCE_PATH = os.path.join(os.path.dirname(__file__), "model", "feature_importance.json")
+EVAL_METRICS_PATH = os.path.join(os.path.dirname(__file__), "model", "eval_metrics.json")
+
+# Pre-serialized bodies of the JSON artifacts served by read-heavy endpoints
+artifact_cache = ArtifactCache()
+model_version = None
 
 try:
     model = joblib.load(MODEL_PATH)
     model_loaded = True
+    model_version = file_digest(MODEL_PATH)
     
     # Load feature names (this should match the training script)
     feature_names = [
@@ -35,29 +51,49 @@ except Exception as e:
     model_error = str(e)
     analytics = None
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        connection = pymysql.connect(**MYSQL_CONFIG)
-        return connection
-    except Exception as e:
-        print(f"Database connection error: {e}")
-        return None
+# Streaming drift sketches against the reference saved by train.py; monitoring
+# is optional, so a bad reference never disables serving
+try:
+    drift_monitor = DriftMonitor.load() if model_loaded else None
+except Exception as e:
+    print(f"Drift monitor not loaded: {e}")
+    drift_monitor = None
+
+# Shadow and canary scoring with a candidate model, when one is configured
+shadow = ShadowScorer.from_env() if model_loaded else None
+
+# Rate limiting and load shedding for the CPU-bound inference endpoints
+admission = AdmissionController()
+
+# Pluggable application store (MySQL, local SQLite, or MySQL with SQLite fallback)
+storage = create_storage()
+
+# Portfolio-wide scenario simulation over stored applications or a CSV
+scenario_engine = ScenarioEngine(model, storage) if model_loaded else None
 
 @app.route("/api/health", methods=["GET"])
 def health():
     """Health check endpoint"""
-    db_status = "ok" if get_db_connection() else "error"
+    # Only the active backend is checked, so MySQL is contacted only when configured
+    try:
+        db_status = "ok" if storage.is_available() else "error"
+    except Exception as e:
+        print(f"Storage health check error: {e}")
+        db_status = "error"
     return jsonify({
         "status": "ok" if model_loaded else "error",
         "model_loaded": model_loaded,
         "model_path": MODEL_PATH,
         "model_error": None if model_loaded else model_error,
+        "model_version": model_version,
         "database": db_status,
-        "analytics_loaded": analytics is not None
+        "storage": storage.name,
+        "analytics_loaded": analytics is not None,
+        "shadow_enabled": shadow is not None
     })
 
 @app.route("/api/predict", methods=["POST"])
+@admission.admit(cost=1)
 def predict():
     """Predict loan approval"""
     if not model_loaded:
@@ -84,44 +120,54 @@ def predict():
         # Ensure DataFrame is in the right format for prediction
         df = pd.DataFrame([input_data])  # Wrap in a list for single row
 
-        # Predict
-        probability = model.predict_proba(df)[0][1]  # Probability of Approval
+        # Predict, serving a weighted share of traffic from the canary model
+        served_by = "candidate" if shadow and shadow.use_candidate() else "production"
+        probability = None
+        if served_by == "candidate":
+            start = time.perf_counter()
+            try:
+                probability = shadow.candidate.predict_proba(df)[0][1]
+            except Exception as canary_error:
+                # A failing candidate must never fail a request; production answers instead
+                print(f"Canary scoring error: {canary_error}")
+                shadow.record_canary_error()
+                served_by = "production"
+        if probability is None:
+            start = time.perf_counter()
+            probability = model.predict_proba(df)[0][1]  # Probability of Approval
+        latency = time.perf_counter() - start
         status = "Approved" if probability >= 0.5 else "Rejected"
 
+        if shadow:
+            shadow.record_served(served_by, latency)
+            if served_by == "production":
+                shadow.submit(input_data, float(probability))
 
+        if drift_monitor:
+            try:
+                # Canary scores are left out so prediction drift tracks the production model only
+                drift_monitor.update(input_data, float(probability) if served_by == "production" else None)
+            except Exception as monitor_error:
+                print(f"Drift monitor error: {monitor_error}")
 
-        # Store prediction in database
+        # Store prediction
+        stored = False
         try:
-            conn = get_db_connection()
-            if conn:
-                cursor = conn.cursor()
-                sql = """
-                INSERT INTO applications (
-                    no_of_dependents, education, self_employed, income_annum,
-                    loan_amount, loan_term, cibil_score, residential_assets_value,
-                    commercial_assets_value, luxury_assets_value, bank_asset_value,
-                    predicted_probability, predicted_status
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                cursor.execute(sql, (
-                    input_data['no_of_dependents'], input_data['education'],
-                    input_data['self_employed'], input_data['income_annum'],
-                    input_data['loan_amount'], input_data['loan_term'],
-                    input_data['cibil_score'], input_data['residential_assets_value'],
-                    input_data['commercial_assets_value'], input_data['luxury_assets_value'],
-                    input_data['bank_asset_value'], probability, status
-                ))
-                conn.commit()
-                cursor.close()
-                conn.close()
+            stored = storage.save_application({
+                **input_data,
+                "predicted_probability": float(probability),
+                "predicted_status": status
+            })
         except Exception as db_error:
             print(f"Database error: {db_error}")
-            # Continue without database storage if there's an error
+            # Continue without storage if there's an error
 
         return jsonify({
             "probability": round(probability, 4),
             "status": status,
-            "stored_in_db": conn is not None
+            "stored_in_db": stored,
+            "storage": storage.name,
+            "model": served_by
         })
 
     except Exception as e:
@@ -132,18 +178,27 @@ def get_feature_importance():
     """Get feature importance"""
     try:
         if os.path.exists(FEATURE_IMPORTANCE_PATH):
-            with open(FEATURE_IMPORTANCE_PATH, 'r') as f:
-                feature_importance = json.load(f)
+            def build():
+                with open(FEATURE_IMPORTANCE_PATH, 'r') as f:
+                    return {"feature_importance": json.load(f)}
         elif analytics:
-            feature_importance = analytics.get_feature_importance()
+            def build():
+                return {"feature_importance": analytics.get_feature_importance()}
         else:
             return jsonify({"error": "Feature importance not available"}), 404
-        
-        return jsonify({"feature_importance": feature_importance})
+
+        entry = artifact_cache.get(
+            "feature_importance",
+            ArtifactCache.files_version([FEATURE_IMPORTANCE_PATH]) + (model_version,),
+            build,
+            tag_prefix=(model_version or "nomodel")[:12]
+        )
+        return artifact_response(entry)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/recommendations", methods=["POST"])
+@admission.admit(cost=RECOMMENDATIONS_COST, pool="heavy")
 def get_recommendations():
     """Get recommendations to improve loan approval probability"""
     if not analytics:
@@ -168,7 +223,35 @@ def get_recommendations():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+def sse_event(event, payload):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+
+def stream_what_if(df, feature_name, min_val, max_val, steps):
+    """Stream what-if sweep points as server-sent events"""
+    original_value = float(df[feature_name].iloc[0])
+
+    def generate():
+        yield sse_event("meta", {
+            "feature": feature_name,
+            "original_value": original_value,
+            "total": steps + 1
+        })
+        try:
+            for point in analytics.iter_what_if(df, feature_name, min_val, max_val, steps):
+                yield sse_event("point", point)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+            return
+        yield sse_event("done", {"total": steps + 1})
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route("/api/what-if", methods=["POST"])
+@admission.admit(cost=what_if_cost, pool="heavy")
 def what_if_analysis():
     """Perform what-if analysis"""
     if not analytics:
@@ -185,36 +268,80 @@ def what_if_analysis():
         if not all([input_data, feature_name, min_val is not None, max_val is not None]):
             return jsonify({"error": "Missing required parameters"}), 400
 
+        if not isinstance(steps, int) or not 1 <= steps <= MAX_WHAT_IF_STEPS:
+            return jsonify({"error": f"steps must be an integer between 1 and {MAX_WHAT_IF_STEPS}"}), 400
+
         # Create DataFrame
         df = pd.DataFrame([input_data])
 
+        # Stream sweep points as server-sent events while they are scored
+        if request.args.get('stream') in ('1', 'true'):
+            return stream_what_if(df, feature_name, min_val, max_val, steps)
+
         # Perform what-if analysis
         results = analytics.what_if_analysis(df, feature_name, min_val, max_val, steps)
 
+        if request.args.get('format') == 'columnar':
+            results['results'] = to_columnar(results['results'])
+
         return jsonify(results)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route("/api/scenarios", methods=["POST"])
+@admission.admit(cost=1)
+def run_scenario():
+    """Start a portfolio scenario simulation"""
+    if not scenario_engine:
+        return jsonify({"error": "Model not loaded"}), 500
+
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data, dict):
+            return jsonify({"error": "Invalid or empty JSON body"}), 400
+
+        job = scenario_engine.submit(
+            data.get('transforms'),
+            source=data.get('source', 'applications'),
+            csv_path=data.get('csv_path')
+        )
+        if job is None:
+            return jsonify({"error": "Too many scenario jobs running, try again later"}), 503
+
+        return jsonify(job.to_dict()), 202
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/scenarios/<job_id>", methods=["GET"])
+def get_scenario(job_id):
+    """Get progress or results of a scenario simulation"""
+    job = scenario_engine.get(job_id) if scenario_engine else None
+    if not job:
+        return jsonify({"error": "Scenario job not found"}), 404
+    return jsonify(job.to_dict())
+
 @app.route("/api/history", methods=["GET"])
 def get_history():
     """Get prediction history"""
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"error": "Database connection failed"}), 500
-
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-        cursor.execute("""
-            SELECT * FROM applications 
-            ORDER BY created_at DESC 
-            LIMIT 50
-        """)
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
-
-        return jsonify({"predictions": results})
+        # The latest row id versions the history, so unchanged polls are
+        # answered with a 304 without running the full query
+        response_format = 'columnar' if request.args.get('format') == 'columnar' else 'records'
+        etag = f"history-{response_format}-{storage.history_version()}"
+        response = not_modified(etag, HISTORY_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        results = storage.recent_applications(50)
+
+        if response_format == 'columnar':
+            results = to_columnar(results)
+
+        return cached_response(serialize({"predictions": results}), etag, HISTORY_CACHE_CONTROL)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -223,22 +350,57 @@ def get_history():
 def get_analytics_summary():
     """Get analytics summary including feature importance and model metrics"""
     try:
-        summary = {}
-        
-        # Get feature importance
-        if os.path.exists(FEATURE_IMPORTANCE_PATH):
-            with open(FEATURE_IMPORTANCE_PATH, 'r') as f:
-                summary['feature_importance'] = json.load(f)
-        
-        # Get model metrics
-        eval_metrics_path = os.path.join(os.path.dirname(__file__), "model", "eval_metrics.json")
-        if os.path.exists(eval_metrics_path):
-            with open(eval_metrics_path, 'r') as f:
-                summary['model_metrics'] = json.load(f)
-        
-        return jsonify(summary)
+        def build():
+            summary = {}
+
+            # Get feature importance
+            if os.path.exists(FEATURE_IMPORTANCE_PATH):
+                with open(FEATURE_IMPORTANCE_PATH, 'r') as f:
+                    summary['feature_importance'] = json.load(f)
+
+            # Get model metrics
+            if os.path.exists(EVAL_METRICS_PATH):
+                with open(EVAL_METRICS_PATH, 'r') as f:
+                    summary['model_metrics'] = json.load(f)
+
+            return summary
+
+        entry = artifact_cache.get(
+            "analytics_summary",
+            ArtifactCache.files_version([FEATURE_IMPORTANCE_PATH, EVAL_METRICS_PATH]) + (model_version,),
+            build,
+            tag_prefix=(model_version or "nomodel")[:12]
+        )
+        return artifact_response(entry)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/monitoring/drift", methods=["GET"])
+def get_drift_report():
+    """Get data and prediction drift against the training reference"""
+    if not drift_monitor:
+        return jsonify({"error": "Drift reference not available, run train.py to create it"}), 404
+    return jsonify(drift_monitor.report())
+
+@app.route("/api/shadow/stats", methods=["GET"])
+def get_shadow_stats():
+    """Get shadow and canary comparison between production and candidate models"""
+    if not shadow:
+        return jsonify({"error": "No candidate model configured, set CANDIDATE_MODEL_PATH"}), 404
+    return jsonify(shadow.stats())
+
+@app.route("/api/admission", methods=["GET"])
+def get_admission_stats():
+    """Get rate limiting, queue depth and load shedding counters"""
+    return jsonify(admission.stats())
+
+@app.route("/api/metrics/serialization", methods=["GET"])
+def get_serialization_metrics():
+    """Get JSON serialization timings per endpoint"""
+    return jsonify({
+        "encoder": app.json.encoder,
+        "endpoints": app.json.stats.snapshot()
+    })
+
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)
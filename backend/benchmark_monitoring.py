@@ -0,0 +1,39 @@
+"""
+Benchmark the per-request overhead of drift monitoring.
+
+Replays dataset rows through DriftMonitor.update and times it, along with
+the cost of a drift report. Run with: python benchmark_monitoring.py
+"""
+import timeit
+
+import numpy as np
+
+from dataset_cache import load_dataset
+from monitoring import DriftMonitor
+
+ROUNDS = 20
+
+
+def main():
+    monitor = DriftMonitor.load()
+    if monitor is None:
+        print("❌ Drift reference not found, run train.py first")
+        return
+
+    df, _ = load_dataset()
+    records = df.drop(columns=["loan_id", "loan_status"]).astype(object).to_dict("records")
+    probabilities = np.random.default_rng(42).random(len(records)).tolist()
+
+    def replay():
+        for record, probability in zip(records, probabilities):
+            monitor.update(record, probability)
+
+    seconds = timeit.timeit(replay, number=ROUNDS)
+    print(f"update: {seconds / (ROUNDS * len(records)) * 1e6:.2f} us per request")
+
+    seconds = timeit.timeit(monitor.report, number=1000)
+    print(f"report: {seconds / 1000 * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
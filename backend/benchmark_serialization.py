@@ -0,0 +1,88 @@
+"""
+Benchmark JSON serialization of representative API payloads.
+
+Compares the stdlib and orjson encoders of FastJSONProvider, in row and
+columnar layout, for the payload shapes returned by each endpoint.
+Run with: python benchmark_serialization.py
+"""
+import datetime
+import decimal
+import json
+import os
+import timeit
+
+import numpy as np
+from flask import Flask
+
+from json_provider import FastJSONProvider, orjson, to_columnar
+
+ROUNDS = 200
+
+
+def history_payload(rows=50):
+    """Rows shaped like SELECT * FROM applications"""
+    now = datetime.datetime.now()
+    return [{
+        "id": i,
+        "loan_id": None,
+        "no_of_dependents": i % 5,
+        "education": " Graduate",
+        "self_employed": " No",
+        "income_annum": 5000000 + i,
+        "loan_amount": 15000000,
+        "loan_term": 12,
+        "cibil_score": 750,
+        "residential_assets_value": 5000000,
+        "commercial_assets_value": 3000000,
+        "luxury_assets_value": 8000000,
+        "bank_asset_value": 2000000,
+        "predicted_probability": decimal.Decimal("0.91234"),
+        "predicted_status": "Approved",
+        "created_at": now - datetime.timedelta(minutes=i)
+    } for i in range(rows)]
+
+
+def what_if_payload(steps=1000):
+    """Sweep points shaped like LoanAnalytics.what_if_analysis results"""
+    probabilities = np.random.default_rng(42).random(steps + 1)
+    return [{
+        "value": float(i * 1000),
+        "probability": probabilities[i],
+        "status": "Approved" if probabilities[i] >= 0.5 else "Rejected"
+    } for i in range(steps + 1)]
+
+
+def summary_payload():
+    """Contents of the analytics summary artifacts"""
+    path = os.path.join(os.path.dirname(__file__), "model", "eval_metrics.json")
+    with open(path, 'r') as f:
+        metrics = json.load(f)
+    return {"feature_importance": metrics.get("feature_importance", {}), "model_metrics": metrics}
+
+
+def main():
+    app = Flask(__name__)
+    encoders = ["stdlib"] + (["orjson"] if orjson is not None else [])
+
+    history = history_payload()
+    what_if = what_if_payload()
+    payloads = {
+        "get_history": {"predictions": history},
+        "get_history (columnar)": {"predictions": to_columnar(history)},
+        "what_if_analysis": {"feature": "income_annum", "original_value": 0.0, "results": what_if},
+        "what_if_analysis (columnar)": {"feature": "income_annum", "original_value": 0.0,
+                                        "results": to_columnar(what_if)},
+        "get_analytics_summary": summary_payload()
+    }
+
+    print(f"{'endpoint':32} {'encoder':8} {'mean_us':>10} {'bytes':>8}")
+    for name, payload in payloads.items():
+        for encoder in encoders:
+            provider = FastJSONProvider(app, encoder=encoder)
+            size = len(provider.dumps_bytes(payload))
+            seconds = timeit.timeit(lambda: provider.dumps_bytes(payload), number=ROUNDS)
+            print(f"{name:32} {encoder:8} {seconds / ROUNDS * 1e6:10.1f} {size:8d}")
+
+
+if __name__ == "__main__":
+    main()
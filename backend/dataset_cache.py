@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:  # without pyarrow the cache falls back to pickle
+    PARQUET_AVAILABLE = False
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), "..", "loan_approval_dataset.csv")
+CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join(os.path.dirname(__file__), "cache"))
+
+CATEGORICAL_COLUMNS = ["education", "self_employed", "loan_status"]
+
+# Bump when the loading or cleaning logic changes to invalidate cached artifacts
+LOADER_VERSION = 1
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compact_dtypes(df):
+    """Downcast integer columns to int32 where they fit and strings to categoricals"""
+    int32 = np.iinfo(np.int32)
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype("category")
+        elif pd.api.types.is_integer_dtype(df[column]):
+            fits = df[column].empty or (df[column].min() >= int32.min and df[column].max() <= int32.max)
+            df[column] = df[column].astype(np.int32 if fits else np.int64)
+    return df
+
+
+def read_dataset_csv(path):
+    """Parse and clean the raw loan dataset CSV"""
+    df = pd.read_csv(path)
+
+    # Clean column names by stripping whitespace
+    df.columns = df.columns.str.strip()
+
+    # Handle missing values
+    df = df.dropna()  # Remove rows with any missing values
+
+    return compact_dtypes(df)
+
+
+def _dataset_cache_path(key):
+    extension = "parquet" if PARQUET_AVAILABLE else "pkl"
+    return os.path.join(CACHE_DIR, f"dataset-{key[:16]}.{extension}")
+
+
+def dataset_key(path=DATASET_PATH):
+    """Cache key of a dataset: its content hash and the loader version"""
+    return hashlib.sha256(f"{content_hash(path)}:{LOADER_VERSION}".encode()).hexdigest()
+
+
+def load_dataset(path=DATASET_PATH, key=None):
+    """Load a dataset CSV through the columnar cache.
+
+    The cleaned DataFrame with compact dtypes is stored under CACHE_DIR,
+    keyed on the CSV's content hash, so later loads of an unchanged file
+    skip CSV parsing. Returns (DataFrame, key).
+    """
+    key = key or dataset_key(path)
+    cache_path = _dataset_cache_path(key)
+
+    if os.path.exists(cache_path):
+        try:
+            if cache_path.endswith(".parquet"):
+                return pd.read_parquet(cache_path), key
+            return pd.read_pickle(cache_path), key
+        except Exception as e:
+            print(f"Ignoring unreadable dataset cache {cache_path}: {e}")
+
+    df = read_dataset_csv(path)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    if cache_path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    return df, key
+
+
+def preprocessing_key(dataset, preprocessor, **split_params):
+    """Cache key of a fitted preprocessor: dataset, preprocessor params and split"""
+    params = {
+        "dataset": dataset,
+        "preprocessor": repr(preprocessor.get_params(deep=True)),
+        "split": split_params,
+        "sklearn": sklearn.__version__
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def fit_preprocessor_cached(preprocessor, X_train, X_test, key):
+    """Fit preprocessor on X_train and transform both splits, reusing a cached result.
+
+    Returns (fitted preprocessor, transformed X_train, transformed X_test).
+    The key should come from preprocessing_key so that any change to the
+    data, the preprocessing parameters or the split invalidates the cache.
+    """
+    cache_path = os.path.join(CACHE_DIR, f"preprocessor-{key[:16]}.joblib")
+
+    if os.path.exists(cache_path):
+        try:
+            return joblib.load(cache_path)
+        except Exception as e:
+            print(f"Ignoring unreadable preprocessor cache {cache_path}: {e}")
+
+    Xt_train = preprocessor.fit_transform(X_train)
+    Xt_test = preprocessor.transform(X_test)
+    result = (preprocessor, Xt_train, Xt_test)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    joblib.dump(result, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    return result
@@ -11,6 +11,16 @@ MYSQL_CONFIG = {
     "user": os.getenv("MYSQL_USER", "root"),
     "password": os.getenv("MYSQL_PASSWORD", ""),
     "database": os.getenv("MYSQL_DB", "loan_app"),
+    "connect_timeout": int(os.getenv("MYSQL_CONNECT_TIMEOUT", "5")),
 }
 
+# Storage backend for applications: "mysql", "sqlite", or "auto" (MySQL with
+# a local SQLite fallback when it is unreachable)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "auto")
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(__file__), "loan_app.sqlite3"))
+SQLITE_BATCH_SIZE = int(os.getenv("SQLITE_BATCH_SIZE", "100"))
+SQLITE_FLUSH_INTERVAL = float(os.getenv("SQLITE_FLUSH_INTERVAL", "0.5"))
+# Seconds to wait before retrying MySQL after a failed connection
+MYSQL_RETRY_INTERVAL = float(os.getenv("MYSQL_RETRY_INTERVAL", "30"))
+
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
@@ -19,5 +19,7 @@ CREATE TABLE IF NOT EXISTS applications (
     bank_asset_value BIGINT NULL,
     predicted_probability DECIMAL(6,5) NULL,
     predicted_status VARCHAR(16) NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Rows bulk-synced from a local SQLite store are deduplicated by loan_id
+    INDEX idx_applications_loan_id (loan_id)
 );
@@ -0,0 +1,33 @@
+-- Local embedded store mirroring the applications table in schema.sql
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    loan_id TEXT NULL,
+    no_of_dependents INTEGER NULL,
+    education TEXT NULL,
+    self_employed TEXT NULL,
+    income_annum INTEGER NULL,
+    loan_amount INTEGER NULL,
+    loan_term INTEGER NULL,
+    cibil_score INTEGER NULL,
+    residential_assets_value INTEGER NULL,
+    commercial_assets_value INTEGER NULL,
+    luxury_assets_value INTEGER NULL,
+    bank_asset_value INTEGER NULL,
+    predicted_probability REAL NULL,
+    predicted_status TEXT NULL,
+    created_at TEXT NOT NULL,
+    -- 1 once the row has been bulk-synced to MySQL
+    synced INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_applications_created_at ON applications (created_at);
+CREATE INDEX IF NOT EXISTS idx_applications_unsynced ON applications (id) WHERE synced = 0;
+
+-- Identifies this local store; with the row id it forms the loan_id written
+-- to MySQL on sync, so a re-synced row is recognised and skipped
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
@@ -0,0 +1,402 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pymysql
+
+from db.db_config import (
+    MYSQL_CONFIG, STORAGE_BACKEND, SQLITE_PATH, SQLITE_BATCH_SIZE,
+    SQLITE_FLUSH_INTERVAL, MYSQL_RETRY_INTERVAL
+)
+
+SQLITE_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema_sqlite.sql")
+
+# Columns of the applications table written on every prediction
+APPLICATION_FIELDS = [
+    'no_of_dependents', 'education', 'self_employed', 'income_annum',
+    'loan_amount', 'loan_term', 'cibil_score', 'residential_assets_value',
+    'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value',
+    'predicted_probability', 'predicted_status'
+]
+
+# Model input columns, streamed for portfolio-wide scoring
+FEATURE_FIELDS = APPLICATION_FIELDS[:11]
+
+# Columns returned by history reads, matching SELECT * on the MySQL table
+HISTORY_COLUMNS = ['id', 'loan_id'] + APPLICATION_FIELDS + ['created_at']
+
+
+def _record_values(record, fields=APPLICATION_FIELDS):
+    return tuple(record.get(field) for field in fields)
+
+
+class MySQLStorage:
+    """Applications stored in the MySQL table from schema.sql"""
+
+    name = "mysql"
+
+    def __init__(self, config=MYSQL_CONFIG):
+        self.config = config
+
+    def connect(self):
+        return pymysql.connect(**self.config)
+
+    def is_available(self):
+        try:
+            self.connect().close()
+            return True
+        except Exception:
+            return False
+
+    def save_application(self, record):
+        """Insert one application row"""
+        self.save_many([record])
+        return True
+
+    def save_many(self, records, fields=APPLICATION_FIELDS):
+        """Insert application rows in a single executemany"""
+        if not records:
+            return
+        sql = f"INSERT INTO applications ({', '.join(fields)}) VALUES ({', '.join(['%s'] * len(fields))})"
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(sql, [_record_values(record, fields) for record in records])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def existing_loan_ids(self, loan_ids):
+        """Return the subset of loan_ids already present in the table"""
+        if not loan_ids:
+            return set()
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT loan_id FROM applications WHERE loan_id IN ({', '.join(['%s'] * len(loan_ids))})",
+                    list(loan_ids)
+                )
+                return {row[0] for row in cursor.fetchall()}
+        finally:
+            conn.close()
+
+    def latest_id(self):
+        """Return the id of the most recent application row, or 0 if empty"""
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT MAX(id) FROM applications")
+                row = cursor.fetchone()
+        finally:
+            conn.close()
+        return (row[0] if row else None) or 0
+
+    def recent_applications(self, limit=50):
+        conn = self.connect()
+        try:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM applications
+                    ORDER BY created_at DESC
+                    LIMIT %s
+                """, (limit,))
+                return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def history_version(self):
+        return f"{self.name}-{self.latest_id()}"
+
+    def count_applications(self):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM applications")
+                return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def iter_applications(self, chunk_size=50000):
+        """Stream model input columns of all applications as DataFrame chunks"""
+        conn = self.connect()
+        try:
+            with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+                cursor.execute(f"SELECT {', '.join(FEATURE_FIELDS)} FROM applications")
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield pd.DataFrame.from_records(rows, columns=FEATURE_FIELDS)
+        finally:
+            conn.close()
+
+
+class SQLiteStorage:
+    """Applications stored in a local embedded SQLite database in WAL mode.
+
+    Writes are buffered and flushed by a background thread in batches of
+    SQLITE_BATCH_SIZE rows or every SQLITE_FLUSH_INTERVAL seconds, whichever
+    comes first. Reads flush pending rows first so history is never stale.
+    Rows carry a synced flag so they can later be bulk-synced to MySQL.
+
+    All threads share one connection guarded by a lock, since the threaded
+    server runs each request on a new thread; only full-table streams open
+    their own connection so a long scan does not hold the lock.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH, batch_size=SQLITE_BATCH_SIZE, flush_interval=SQLITE_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = self._open()
+        with open(SQLITE_SCHEMA_PATH, 'r') as f:
+            self._conn.executescript(f.read())
+        self.store_id = self._load_store_id()
+
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def close(self):
+        """Flush pending rows and close the shared connection"""
+        self.flush()
+        with self._db_lock:
+            self._closed = True
+            self._conn.close()
+
+    def _load_store_id(self):
+        """Random id of this database file, created on first open"""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('store_id', ?)",
+                (uuid.uuid4().hex[:16],)
+            )
+        return self._conn.execute("SELECT value FROM store_meta WHERE key = 'store_id'").fetchone()[0]
+
+    def sync_key(self, row_id):
+        """loan_id a local row is written to MySQL under"""
+        return f"sqlite-{self.store_id}-{row_id}"
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"SQLite flush error: {e}")
+
+    def is_available(self):
+        return True
+
+    def save_application(self, record):
+        """Queue one application row for the next batched write"""
+        row = _record_values(record) + (datetime.now().isoformat(timespec='seconds'),)
+        with self._pending_lock:
+            self._pending.append(row)
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Write all pending rows in one transaction"""
+        with self._db_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            columns = APPLICATION_FIELDS + ['created_at']
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO applications ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                    rows
+                )
+            return len(rows)
+
+    def latest_id(self):
+        self.flush()
+        with self._db_lock:
+            row = self._conn.execute("SELECT MAX(id) FROM applications").fetchone()
+        return (row[0] if row else None) or 0
+
+    def recent_applications(self, limit=50):
+        self.flush()
+        with self._db_lock:
+            cursor = self._conn.execute(f"""
+                SELECT {', '.join(HISTORY_COLUMNS)} FROM applications
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            """, (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def history_version(self):
+        return f"{self.name}-{self.latest_id()}"
+
+    def count_applications(self):
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+
+    def iter_applications(self, chunk_size=50000):
+        """Stream model input columns of all applications as DataFrame chunks"""
+        self.flush()
+        conn = self._open()
+        conn.row_factory = None
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(FEATURE_FIELDS)} FROM applications")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield pd.DataFrame.from_records(rows, columns=FEATURE_FIELDS)
+        finally:
+            conn.close()
+
+    def unsynced_applications(self, limit=500):
+        """Oldest rows not yet synced to MySQL"""
+        self.flush()
+        with self._db_lock:
+            cursor = self._conn.execute(f"""
+                SELECT id, {', '.join(APPLICATION_FIELDS)}, created_at FROM applications
+                WHERE synced = 0
+                ORDER BY id
+                LIMIT ?
+            """, (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def mark_synced(self, ids):
+        with self._db_lock, self._conn:
+            self._conn.executemany("UPDATE applications SET synced = 1 WHERE id = ?", [(i,) for i in ids])
+
+
+class FallbackStorage:
+    """MySQL as the primary store with a local SQLite fallback.
+
+    A failed MySQL connection switches reads and writes to SQLite for
+    MYSQL_RETRY_INTERVAL seconds, so an unreachable server costs one
+    connection timeout rather than one per request.
+    """
+
+    def __init__(self, primary, fallback, retry_interval=MYSQL_RETRY_INTERVAL):
+        self.primary = primary
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+        self._retry_at = 0.0
+
+    @property
+    def name(self):
+        return self.active.name
+
+    @property
+    def active(self):
+        if time.monotonic() < self._retry_at:
+            return self.fallback
+        return self.primary
+
+    def _call(self, method, *args):
+        store = self.active
+        if store is self.primary:
+            try:
+                return getattr(store, method)(*args)
+            except pymysql.err.OperationalError as e:
+                print(f"Database connection error: {e}, falling back to {self.fallback.name}")
+                self._retry_at = time.monotonic() + self.retry_interval
+        return getattr(self.fallback, method)(*args)
+
+    def is_available(self):
+        """Check the active store, falling back to SQLite if MySQL is unreachable"""
+        store = self.active
+        if store is self.primary and not store.is_available():
+            self._retry_at = time.monotonic() + self.retry_interval
+            store = self.fallback
+        return store.is_available()
+
+    def save_application(self, record):
+        return self._call("save_application", record)
+
+    def latest_id(self):
+        return self._call("latest_id")
+
+    def recent_applications(self, limit=50):
+        return self._call("recent_applications", limit)
+
+    def history_version(self):
+        return self._call("history_version")
+
+    def count_applications(self):
+        return self._call("count_applications")
+
+    def iter_applications(self, chunk_size=50000):
+        # Pick the store once so a stream never mixes rows from both
+        store = self.active
+        if store is self.primary and not store.is_available():
+            self._retry_at = time.monotonic() + self.retry_interval
+            store = self.fallback
+        return store.iter_applications(chunk_size)
+
+
+def sync_to_mysql(local, mysql, batch_size=500):
+    """Bulk-copy rows from the local store to MySQL, returning the count synced.
+
+    Each row is written with loan_id set to its local sync key, and rows whose
+    key is already in MySQL are skipped. A sync interrupted between the MySQL
+    commit and marking the rows synced locally therefore does not duplicate
+    them when it is rerun.
+    """
+    synced = 0
+    while True:
+        rows = local.unsynced_applications(batch_size)
+        if not rows:
+            return synced
+        for row in rows:
+            row['loan_id'] = local.sync_key(row['id'])
+            row['created_at'] = datetime.fromisoformat(row['created_at'])
+        existing = mysql.existing_loan_ids([row['loan_id'] for row in rows])
+        new_rows = [row for row in rows if row['loan_id'] not in existing]
+        mysql.save_many(new_rows, fields=['loan_id'] + APPLICATION_FIELDS + ['created_at'])
+        local.mark_synced([row['id'] for row in rows])
+        synced += len(new_rows)
+
+
+def create_storage(backend=STORAGE_BACKEND):
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    if backend == "mysql":
+        return MySQLStorage()
+    if backend == "sqlite":
+        return SQLiteStorage()
+    if backend == "auto":
+        return FallbackStorage(MySQLStorage(), SQLiteStorage())
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+if __name__ == "__main__":
+    # Bulk-sync locally stored applications to MySQL: python -m db.storage
+    count = sync_to_mysql(SQLiteStorage(), MySQLStorage())
+    print(f"✅ Synced {count} applications to MySQL")
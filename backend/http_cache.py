@@ -0,0 +1,193 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import current_app, request, make_response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# Cache-Control policies for the read-heavy endpoints
+ARTIFACT_CACHE_CONTROL = os.getenv("ARTIFACT_CACHE_CONTROL", "public, max-age=60, must-revalidate")
+HISTORY_CACHE_CONTROL = os.getenv("HISTORY_CACHE_CONTROL", "no-cache")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Compute the sha256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def serialize(payload):
+    """Serialize a payload to UTF-8 JSON bytes with the app's JSON provider"""
+    provider = current_app.json
+    if hasattr(provider, "dumps_bytes"):
+        return provider.dumps_bytes(payload)
+    return provider.dumps(payload).encode("utf-8")
+
+
+class ArtifactCache:
+    """In-memory cache of pre-serialized response bodies for static artifacts.
+
+    Entries are keyed on a name and invalidated when the version of the
+    underlying files (mtime and size) changes, so a retrain picks up the new
+    artifacts without a restart. Compressed variants are cached alongside the
+    raw bytes.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def files_version(paths):
+        """Version tuple for a set of files, None for missing ones"""
+        version = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                version.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append((path, None, None))
+        return tuple(version)
+
+    def get(self, name, version, build, tag_prefix=""):
+        """Return the cached entry for name, rebuilding it if the version changed.
+
+        build() must return the JSON-serializable payload. The entry is a dict
+        with the raw body, its strong ETag and a slot for compressed variants.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry["version"] == version:
+                return entry
+
+        body = serialize(build())
+        content_hash = hashlib.sha256(body).hexdigest()[:16]
+        etag = f"{tag_prefix}-{content_hash}" if tag_prefix else content_hash
+        entry = {"version": version, "body": body, "etag": etag, "encoded": {}}
+
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    """Compress body with the given content coding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def _matching_etag(if_none_match, etag):
+    """Match an If-None-Match header against a base ETag.
+
+    Encoded representations carry the coding as a suffix on the ETag, so a
+    client tag matches if it is the base tag or one of its encoded variants.
+    Returns the matched tag, or None.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == etag or tag in (f"{etag}-gzip", f"{etag}-br"):
+            return tag
+    return None
+
+
+def not_modified(etag, cache_control):
+    """Return a 304 response if the request's If-None-Match matches etag"""
+    matched = _matching_etag(request.headers.get("If-None-Match"), etag)
+    if matched is None:
+        return None
+    response = make_response("", 304)
+    response.headers["ETag"] = f'"{matched}"'
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def cached_response(body, etag, cache_control, encoded_cache=None):
+    """Build a JSON response with ETag, Cache-Control and optional compression.
+
+    encoded_cache, when given, is a dict used to memoize compressed variants
+    of body (see ArtifactCache).
+    """
+    response = not_modified(etag, cache_control)
+    if response is not None:
+        return response
+
+    encoding = None
+    if len(body) >= COMPRESSION_MIN_SIZE:
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+
+    data = body
+    if encoding:
+        if encoded_cache is not None and encoding in encoded_cache:
+            data = encoded_cache[encoding]
+        else:
+            data = compress(body, encoding)
+            if encoded_cache is not None:
+                encoded_cache[encoding] = data
+
+    response = make_response(data)
+    response.mimetype = "application/json"
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+        response.headers["ETag"] = f'"{etag}-{encoding}"'
+    else:
+        response.headers["ETag"] = f'"{etag}"'
+    return response
+
+
+def artifact_response(entry, cache_control=ARTIFACT_CACHE_CONTROL):
+    """Serve a cached ArtifactCache entry"""
+    return cached_response(entry["body"], entry["etag"], cache_control, entry["encoded"])
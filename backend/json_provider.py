@@ -0,0 +1,141 @@
+import datetime
+import decimal
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder is the fallback
+    orjson = None
+
+# "orjson" or "stdlib"; orjson is used by default when it is installed
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson" if orjson is not None else "stdlib")
+
+
+def _default(obj):
+    """Convert values the encoders do not handle natively"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_columnar(records):
+    """Convert a list of dicts into a column-oriented payload.
+
+    Large lists of homogeneous rows serialize faster and smaller as one
+    list per column than as repeated keys per row.
+    """
+    columns = {}
+    for i, record in enumerate(records):
+        for key, value in record.items():
+            if key not in columns:
+                columns[key] = [None] * i
+            columns[key].append(value)
+        for key, values in columns.items():
+            if len(values) <= i:
+                values.append(None)
+    return {"format": "columnar", "length": len(records), "columns": columns}
+
+
+class SerializationStats:
+    """Per-endpoint serialization timings"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, size):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "total_bytes": 0
+            })
+            ms = seconds * 1000
+            stats["count"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["total_bytes"] += size
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: {
+                    "count": s["count"],
+                    "mean_ms": round(s["total_ms"] / s["count"], 4),
+                    "max_ms": round(s["max_ms"], 4),
+                    "mean_bytes": s["total_bytes"] // s["count"]
+                }
+                for endpoint, s in self._stats.items()
+            }
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to the stdlib encoder.
+
+    Both paths serialize NumPy scalars and arrays, Decimal and datetime
+    values, and record serialization time per endpoint. Keys keep their
+    insertion order, so rows come back in column order.
+    """
+
+    sort_keys = False
+
+    def __init__(self, app, encoder=JSON_ENCODER):
+        super().__init__(app)
+        if encoder == "orjson" and orjson is None:
+            encoder = "stdlib"
+        self.encoder = encoder
+        self.stats = SerializationStats()
+
+    def _encode(self, obj, indent=False):
+        if self.encoder == "orjson":
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+
+        kwargs = {"indent": 2} if indent else {"separators": (",", ":")}
+        return json.dumps(
+            obj, default=_default, ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys, **kwargs
+        ).encode("utf-8")
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serialize obj to UTF-8 bytes, timing it against the current endpoint"""
+        start = time.perf_counter()
+        body = self._encode(obj, indent)
+        if has_request_context():
+            self.stats.record(request.endpoint or "unknown", time.perf_counter() - start, len(body))
+        return body
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a str; options other than indent go through the stdlib provider"""
+        if set(kwargs) - {"indent"}:
+            kwargs.setdefault("default", _default)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if self.encoder == "orjson" and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
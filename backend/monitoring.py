@@ -0,0 +1,192 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+NUMERIC_FEATURES = [
+    'no_of_dependents', 'income_annum', 'loan_amount', 'loan_term', 'cibil_score',
+    'residential_assets_value', 'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value'
+]
+CATEGORICAL_FEATURES = ['education', 'self_employed']
+PREDICTION_FEATURE = 'predicted_probability'
+
+DRIFT_REFERENCE_PATH = os.path.join(os.path.dirname(__file__), "model", "drift_reference.json")
+
+# Live counts are halved whenever this many requests accumulate, so the
+# sketches weight recent traffic and their counters stay bounded
+DRIFT_WINDOW = int(os.getenv("DRIFT_WINDOW", "5000"))
+# Below this many observations drift scores are too noisy to report a status
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+
+# Conventional PSI thresholds
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+OTHER_CATEGORY = "__other__"
+
+
+def _numeric_reference(values, bins, edges=None):
+    """Bin edges (quantiles by default) and the share of reference values in each bin"""
+    if edges is None:
+        edges = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+    edges = sorted(set(float(edge) for edge in edges))
+    counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+    return {"edges": edges, "proportions": (counts / counts.sum()).tolist()}
+
+
+def _categorical_reference(values):
+    categories, counts = np.unique(np.asarray(values, dtype=str), return_counts=True)
+    proportions = counts / counts.sum()
+    return {
+        "categories": categories.tolist() + [OTHER_CATEGORY],
+        "proportions": proportions.tolist() + [0.0]
+    }
+
+
+def build_reference(X, probabilities, bins=10):
+    """Reference distributions of the training features and model predictions.
+
+    Numeric features get quantile bins, so each bin holds roughly the same
+    share of the reference data; categorical features get one bin per
+    category plus one for unseen values. Predicted probabilities pile up
+    near 0 and 1, so they get equal-width bins instead of quantiles.
+    """
+    reference = {"bins": bins, "sample_size": int(len(X)), "features": {}}
+    for feature in NUMERIC_FEATURES:
+        reference["features"][feature] = _numeric_reference(np.asarray(X[feature], dtype=float), bins)
+    for feature in CATEGORICAL_FEATURES:
+        reference["features"][feature] = _categorical_reference(X[feature])
+    reference["features"][PREDICTION_FEATURE] = _numeric_reference(
+        np.asarray(probabilities, dtype=float), bins, edges=np.linspace(0, 1, bins + 1)[1:-1]
+    )
+    return reference
+
+
+def psi(expected, actual, epsilon=1e-4):
+    """Population stability index between two binned distributions"""
+    total = 0.0
+    for e, a in zip(expected, actual):
+        e = max(e, epsilon)
+        a = max(a, epsilon)
+        total += (a - e) * math.log(a / e)
+    return total
+
+
+def ks_statistic(expected, actual):
+    """Kolmogorov-Smirnov distance between two binned distributions"""
+    distance = 0.0
+    cdf_expected = cdf_actual = 0.0
+    for e, a in zip(expected, actual):
+        cdf_expected += e
+        cdf_actual += a
+        distance = max(distance, abs(cdf_expected - cdf_actual))
+    return distance
+
+
+class DriftMonitor:
+    """Fixed-memory histograms of live traffic compared against a reference.
+
+    update() is called on every prediction and costs one bisect per numeric
+    feature; report() is O(features x bins), independent of traffic volume.
+    """
+
+    def __init__(self, reference, window=DRIFT_WINDOW):
+        self.reference = reference
+        self.window = window
+        self._lock = threading.Lock()
+        self._numeric = []
+        self._categorical = []
+        for feature, ref in reference["features"].items():
+            if "edges" in ref:
+                self._numeric.append((feature, ref["edges"]))
+            else:
+                index = {category: i for i, category in enumerate(ref["categories"])}
+                self._categorical.append((feature, index, index[OTHER_CATEGORY]))
+        self._counts = {feature: [0.0] * len(ref["proportions"]) for feature, ref in reference["features"].items()}
+        self.observations = 0
+        self.total_updates = 0
+        self.update_seconds = 0.0
+
+    @classmethod
+    def load(cls, path=DRIFT_REFERENCE_PATH):
+        """Load a monitor from the reference saved by train.py, or None if missing"""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def update(self, input_data, probability):
+        """Add one prediction request to the live histograms; a None probability is skipped"""
+        start = time.perf_counter()
+        values = dict(input_data)
+        values[PREDICTION_FEATURE] = probability
+
+        bins = []
+        for feature, edges in self._numeric:
+            try:
+                value = float(values[feature])
+            except (KeyError, TypeError, ValueError):
+                continue
+            bins.append((feature, bisect.bisect_right(edges, value)))
+        for feature, index, other in self._categorical:
+            if feature in values:
+                bins.append((feature, index.get(str(values[feature]), other)))
+
+        with self._lock:
+            for feature, i in bins:
+                self._counts[feature][i] += 1
+            self.observations += 1
+            if self.observations >= self.window:
+                for counts in self._counts.values():
+                    for i in range(len(counts)):
+                        counts[i] /= 2
+                self.observations /= 2
+            self.total_updates += 1
+            self.update_seconds += time.perf_counter() - start
+
+    def report(self):
+        """PSI and KS per feature against the reference"""
+        with self._lock:
+            counts = {feature: list(c) for feature, c in self._counts.items()}
+            observations = self.observations
+            total_updates = self.total_updates
+            update_seconds = self.update_seconds
+
+        features = {}
+        for feature, ref in self.reference["features"].items():
+            total = sum(counts[feature])
+            if total == 0:
+                continue
+            actual = [c / total for c in counts[feature]]
+            feature_psi = psi(ref["proportions"], actual)
+            features[feature] = {
+                "psi": round(feature_psi, 4),
+                "ks": round(ks_statistic(ref["proportions"], actual), 4),
+                "status": self._status(feature_psi, total)
+            }
+
+        max_psi = max((f["psi"] for f in features.values()), default=0.0)
+        return {
+            "observations": round(observations, 1),
+            "total_requests": total_updates,
+            "status": self._status(max_psi, observations),
+            "max_psi": max_psi,
+            "features": features,
+            "overhead": {
+                "mean_update_us": round(update_seconds / total_updates * 1e6, 2) if total_updates else None
+            }
+        }
+
+    @staticmethod
+    def _status(value, samples):
+        if samples < DRIFT_MIN_SAMPLES:
+            return "insufficient_data"
+        if value >= PSI_SIGNIFICANT:
+            return "significant"
+        if value >= PSI_MODERATE:
+            return "moderate"
+        return "stable"
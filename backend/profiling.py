@@ -0,0 +1,90 @@
+import io
+import os
+import time
+import tracemalloc
+
+import joblib
+import numpy as np
+
+PROFILE_SINGLE_ROUNDS = int(os.getenv("PROFILE_SINGLE_ROUNDS", "200"))
+PROFILE_BATCH_SIZE = int(os.getenv("PROFILE_BATCH_SIZE", "1000"))
+PROFILE_BATCH_ROUNDS = int(os.getenv("PROFILE_BATCH_ROUNDS", "10"))
+PROFILE_LOAD_ROUNDS = 3
+
+
+def _percentiles(seconds):
+    values = np.array(seconds) * 1000
+    return {
+        "mean_ms": round(float(values.mean()), 4),
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4)
+    }
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def profile_model(model, X_sample, single_rounds=PROFILE_SINGLE_ROUNDS,
+                  batch_size=PROFILE_BATCH_SIZE, batch_rounds=PROFILE_BATCH_ROUNDS):
+    """Measure the serving cost of a fitted pipeline.
+
+    Latencies are for predict_proba on raw feature rows, the way the API
+    calls the model, so preprocessing is included. Throughput per core is
+    measured on a single thread (the forest's n_jobs is forced to 1).
+    """
+    classifier = model.steps[-1][1]
+    n_jobs = getattr(classifier, "n_jobs", None)
+    if n_jobs is not None:
+        classifier.set_params(n_jobs=1)
+
+    try:
+        rows = [X_sample.iloc[[i % len(X_sample)]] for i in range(single_rounds)]
+        model.predict_proba(rows[0])  # warm-up
+        single = [_timed(lambda row=row: model.predict_proba(row))[0] for row in rows]
+
+        batch = X_sample.sample(batch_size, replace=True, random_state=42)
+        batch_times = [_timed(lambda: model.predict_proba(batch))[0] for _ in range(batch_rounds)]
+    finally:
+        if n_jobs is not None:
+            classifier.set_params(n_jobs=n_jobs)
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    serialized = buffer.getvalue()
+
+    load_times = []
+    for _ in range(PROFILE_LOAD_ROUNDS):
+        load_seconds, _ = _timed(lambda: joblib.load(io.BytesIO(serialized)))
+        load_times.append(load_seconds)
+
+    # Peak Python-tracked memory to load the model and score one batch
+    tracemalloc.start()
+    try:
+        loaded = joblib.load(io.BytesIO(serialized))
+        loaded.predict_proba(batch)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "single_row_latency": _percentiles(single),
+        "batch_latency": {"batch_size": batch_size, **_percentiles(batch_times)},
+        "throughput_rows_per_sec_per_core": round(batch_size / float(np.median(batch_times)), 1),
+        "serialized_size_bytes": len(serialized),
+        "load_time_ms": round(float(np.median(load_times)) * 1000, 4),
+        "peak_memory_bytes": int(peak)
+    }
+
+
+def select_candidate(candidates, accuracy_tolerance=0.0):
+    """Pick the cheapest candidate whose test accuracy is within tolerance of the best.
+
+    Cost is the p95 single-row latency, the number /api/predict pays.
+    """
+    best_accuracy = max(candidate["test_accuracy"] for candidate in candidates)
+    eligible = [c for c in candidates if c["test_accuracy"] >= best_accuracy - accuracy_tolerance]
+    return min(eligible, key=lambda c: c["profile"]["single_row_latency"]["p95_ms"])
@@ -0,0 +1,307 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+SCENARIO_CHUNK_SIZE = int(os.getenv("SCENARIO_CHUNK_SIZE", "50000"))
+# Scorer threads share the API process, so one core is left for /api/predict
+SCENARIO_WORKERS = int(os.getenv("SCENARIO_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+# Jobs waiting or running at once; further submissions are rejected
+SCENARIO_MAX_PENDING = int(os.getenv("SCENARIO_MAX_PENDING", "4"))
+# Finished jobs kept for polling
+SCENARIO_MAX_JOBS = int(os.getenv("SCENARIO_MAX_JOBS", "50"))
+# CSV sources must live under this directory
+SCENARIO_DATA_DIR = os.path.abspath(os.getenv("SCENARIO_DATA_DIR", os.path.join(os.path.dirname(__file__), "..")))
+
+NUMERIC_FEATURES = [
+    'no_of_dependents', 'income_annum', 'loan_amount', 'loan_term', 'cibil_score',
+    'residential_assets_value', 'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value'
+]
+CATEGORICAL_FEATURES = ['education', 'self_employed']
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# Valid ranges transformed values are clipped to
+FEATURE_BOUNDS = {feature: (0, None) for feature in NUMERIC_FEATURES}
+FEATURE_BOUNDS['cibil_score'] = (300, 900)
+FEATURE_BOUNDS['loan_term'] = (1, None)
+
+OPERATIONS = {
+    "set": lambda values, x: np.full(len(values), x, dtype=float),
+    "add": lambda values, x: values + x,
+    "multiply": lambda values, x: values * x,
+    "cap": lambda values, x: np.minimum(values, x),
+    "floor": lambda values, x: np.maximum(values, x)
+}
+
+# Segments reported in the per-segment breakdown: (name, column, bin edges, labels)
+SEGMENTS = [
+    ("education", "education", None, None),
+    ("self_employed", "self_employed", None, None),
+    ("cibil_band", "cibil_score", [549, 649, 749], ["300-549", "550-649", "650-749", "750-900"]),
+    ("loan_term_band", "loan_term", [6, 12], ["1-6", "7-12", "13+"])
+]
+
+
+def validate_transforms(transforms):
+    """Check a scenario's transforms, raising ValueError on an invalid one"""
+    if not isinstance(transforms, list) or not transforms:
+        raise ValueError("transforms must be a non-empty list")
+    for transform in transforms:
+        if not isinstance(transform, dict):
+            raise ValueError("Each transform must be an object with feature, op and value")
+        feature = transform.get("feature")
+        op = transform.get("op")
+        if feature not in NUMERIC_FEATURES:
+            raise ValueError(f"Unknown numeric feature: {feature}")
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown op: {op}, expected one of {', '.join(OPERATIONS)}")
+        value = transform.get("value")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Transform on {feature} needs a numeric value")
+
+
+def apply_transforms(df, transforms):
+    """Apply transforms to a chunk, returning the new chunk and a mask of changed rows"""
+    transformed = df.copy()
+    changed = np.zeros(len(df), dtype=bool)
+    for transform in transforms:
+        feature = transform["feature"]
+        original = transformed[feature].to_numpy(dtype=float)
+        values = OPERATIONS[transform["op"]](original, transform["value"])
+        low, high = FEATURE_BOUNDS[feature]
+        values = np.clip(values, low, high)
+        changed |= values != original
+        transformed[feature] = values
+    return transformed, changed
+
+
+def resolve_csv_path(csv_path):
+    """Resolve a CSV source path, refusing anything outside SCENARIO_DATA_DIR"""
+    path = os.path.abspath(os.path.join(SCENARIO_DATA_DIR, csv_path))
+    if os.path.commonpath([path, SCENARIO_DATA_DIR]) != SCENARIO_DATA_DIR:
+        raise ValueError("csv_path must be inside the scenario data directory")
+    if not path.endswith(".csv") or not os.path.isfile(path):
+        raise ValueError(f"CSV file not found: {csv_path}")
+    return path
+
+
+def count_csv_rows(path, block_size=1 << 20):
+    """Number of data lines in a CSV, for progress reporting"""
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            lines += block.count(b'\n')
+    return max(0, lines - 1)
+
+
+def csv_chunks(path, job, chunk_size=SCENARIO_CHUNK_SIZE):
+    """Stream feature chunks of a CSV with pd.read_csv, never loading the whole file.
+
+    Column names are stripped like the training dataset's, and rows with
+    missing features are dropped.
+    """
+    job.total_rows = count_csv_rows(path)
+    reader = pd.read_csv(path, chunksize=chunk_size, usecols=lambda column: column.strip() in FEATURES)
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.strip()
+        chunk = chunk[FEATURES].dropna()
+        if not chunk.empty:
+            yield chunk
+
+
+def _segment_labels(df):
+    labels = {}
+    for name, column, edges, bin_labels in SEGMENTS:
+        if edges is None:
+            labels[name] = df[column].astype(str).str.strip().to_numpy()
+        else:
+            index = np.searchsorted(edges, df[column].to_numpy(dtype=float), side='left')
+            labels[name] = np.asarray(bin_labels)[index]
+    return labels
+
+
+class ScenarioAggregate:
+    """Approval counts for the whole portfolio and each segment"""
+
+    def __init__(self):
+        self.totals = self._empty()
+        self.segments = {name: {} for name, _, _, _ in SEGMENTS}
+
+    @staticmethod
+    def _empty():
+        return {"rows": 0, "baseline_approved": 0, "scenario_approved": 0, "newly_approved": 0, "newly_rejected": 0}
+
+    @staticmethod
+    def _add(target, rows, baseline, scenario):
+        target["rows"] += int(rows)
+        target["baseline_approved"] += int(baseline.sum())
+        target["scenario_approved"] += int(scenario.sum())
+        target["newly_approved"] += int((scenario & ~baseline).sum())
+        target["newly_rejected"] += int((baseline & ~scenario).sum())
+
+    def add_chunk(self, labels, baseline, scenario):
+        self._add(self.totals, len(baseline), baseline, scenario)
+        for name, values in labels.items():
+            for label in np.unique(values):
+                mask = values == label
+                segment = self.segments[name].setdefault(str(label), self._empty())
+                self._add(segment, mask.sum(), baseline[mask], scenario[mask])
+
+    @staticmethod
+    def _summary(counts):
+        rows = counts["rows"]
+        baseline_rate = counts["baseline_approved"] / rows if rows else 0.0
+        scenario_rate = counts["scenario_approved"] / rows if rows else 0.0
+        return {
+            **counts,
+            "baseline_approval_rate": round(baseline_rate, 4),
+            "scenario_approval_rate": round(scenario_rate, 4),
+            "approval_rate_shift": round(scenario_rate - baseline_rate, 4)
+        }
+
+    def result(self):
+        return {
+            "overall": self._summary(self.totals),
+            "segments": {
+                name: {label: self._summary(counts) for label, counts in sorted(segments.items())}
+                for name, segments in self.segments.items()
+            }
+        }
+
+
+def score_chunk(model, chunk, transforms):
+    """Score one chunk before and after the transforms.
+
+    Only rows the transforms actually changed are rescored; the rest keep
+    their baseline decision.
+    """
+    chunk = chunk[FEATURES].reset_index(drop=True)
+    baseline = model.predict_proba(chunk)[:, 1] >= 0.5
+    transformed, changed = apply_transforms(chunk, transforms)
+    scenario = baseline.copy()
+    if changed.any():
+        scenario[changed] = model.predict_proba(transformed[changed])[:, 1] >= 0.5
+    return _segment_labels(chunk), baseline, scenario
+
+
+class ScenarioJob:
+    def __init__(self, source, transforms, total_rows):
+        self.id = uuid.uuid4().hex
+        self.source = source
+        self.transforms = transforms
+        self.total_rows = total_rows
+        self.rows_processed = 0
+        self.status = "queued"
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        progress = None
+        if self.total_rows:
+            progress = round(min(1.0, self.rows_processed / self.total_rows), 4)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "source": self.source,
+            "transforms": self.transforms,
+            "rows_processed": self.rows_processed,
+            "total_rows": self.total_rows,
+            "progress": progress,
+            "elapsed_seconds": elapsed,
+            "rows_per_second": round(self.rows_processed / elapsed, 1) if elapsed else None,
+            "error": self.error,
+            "result": self.result
+        }
+
+
+class ScenarioEngine:
+    """Runs portfolio-wide what-if scenarios as background jobs.
+
+    Rows are streamed from the source in chunks and scored on a thread pool,
+    with at most two chunks per worker in flight so memory stays bounded
+    regardless of portfolio size. Progress is updated as each chunk
+    completes and can be polled by job id.
+    """
+
+    def __init__(self, model, storage, workers=SCENARIO_WORKERS, chunk_size=SCENARIO_CHUNK_SIZE):
+        self.model = model
+        self.storage = storage
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        # One job at a time; each job parallelizes its own chunks
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scenario-runner")
+        self._scorers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scenario-scorer")
+
+    def submit(self, transforms, source="applications", csv_path=None):
+        """Validate and queue a scenario, returning its job"""
+        validate_transforms(transforms)
+        if source == "applications":
+            total_rows = self.storage.count_applications()
+            chunks = lambda job: self.storage.iter_applications(self.chunk_size)
+        elif source == "csv":
+            path = resolve_csv_path(csv_path or "")
+            total_rows = None
+            chunks = lambda job: csv_chunks(path, job, self.chunk_size)
+        else:
+            raise ValueError("source must be 'applications' or 'csv'")
+
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status in ("queued", "running"))
+            if pending >= SCENARIO_MAX_PENDING:
+                return None
+            job = ScenarioJob(source if source == "applications" else f"csv:{csv_path}", transforms, total_rows)
+            self._jobs[job.id] = job
+            while len(self._jobs) > SCENARIO_MAX_JOBS:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest].status in ("queued", "running"):
+                    break
+                self._jobs.pop(oldest)
+
+        self._runner.submit(self._run, job, chunks)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, chunks):
+        job.status = "running"
+        job.started_at = time.time()
+        aggregate = ScenarioAggregate()
+        in_flight = deque()
+        try:
+            for chunk in chunks(job):
+                in_flight.append(self._scorers.submit(score_chunk, self.model, chunk, job.transforms))
+                if len(in_flight) >= 2 * self.workers:
+                    self._collect(job, aggregate, in_flight.popleft())
+            while in_flight:
+                self._collect(job, aggregate, in_flight.popleft())
+            job.result = aggregate.result()
+            job.total_rows = job.rows_processed
+            job.status = "completed"
+        except Exception as e:
+            for future in in_flight:
+                future.cancel()
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    @staticmethod
+    def _collect(job, aggregate, future):
+        labels, baseline, scenario = future.result()
+        aggregate.add_chunk(labels, baseline, scenario)
+        job.rows_processed += len(baseline)
@@ -0,0 +1,186 @@
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Candidate model scored alongside production; shadowing is off when unset
+CANDIDATE_MODEL_PATH = os.getenv("CANDIDATE_MODEL_PATH", "")
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "1000"))
+SHADOW_WORKERS = int(os.getenv("SHADOW_WORKERS", "1"))
+SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", "32"))
+SHADOW_BATCH_WAIT = float(os.getenv("SHADOW_BATCH_WAIT", "0.05"))
+# Fraction of /api/predict requests answered by the candidate (0 disables the canary)
+CANARY_WEIGHT = float(os.getenv("CANARY_WEIGHT", "0"))
+
+# Latency samples kept for percentiles
+LATENCY_SAMPLES = 1000
+
+
+def _latency_summary(samples):
+    if not samples:
+        return None
+    values = np.array(samples) * 1000
+    return {
+        "mean_ms": round(float(values.mean()), 4),
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4)
+    }
+
+
+class ShadowScorer:
+    """Scores a copy of live traffic with a candidate model off the request path.
+
+    submit() never blocks: requests go to a bounded queue and are dropped
+    when it is full, so a slow candidate cannot delay production responses.
+    Worker threads drain the queue in micro-batches of up to batch_size rows,
+    waiting at most batch_wait seconds to fill one, and compare candidate
+    scores with the production scores recorded at submit time.
+
+    Shadow latency is per micro-batch and not comparable with the single-row
+    production latency; the canary's latency is the like-for-like figure.
+    """
+
+    def __init__(self, candidate, candidate_path=None, queue_size=SHADOW_QUEUE_SIZE, workers=SHADOW_WORKERS,
+                 batch_size=SHADOW_BATCH_SIZE, batch_wait=SHADOW_BATCH_WAIT, canary_weight=CANARY_WEIGHT):
+        self.candidate = candidate
+        self.candidate_path = candidate_path
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.canary_weight = canary_weight
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.errors = 0
+        self.batches = 0
+        self.disagreements = 0
+        self.abs_diff_total = 0.0
+        self.canary_requests = 0
+        self.canary_errors = 0
+        self.production_requests = 0
+        self._production_latency = deque(maxlen=LATENCY_SAMPLES)
+        self._candidate_batch_latency = deque(maxlen=LATENCY_SAMPLES)
+        self._canary_latency = deque(maxlen=LATENCY_SAMPLES)
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"shadow-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @classmethod
+    def from_env(cls, path=CANDIDATE_MODEL_PATH):
+        """Build a scorer for the candidate at CANDIDATE_MODEL_PATH, or None if unset"""
+        if not path:
+            return None
+        try:
+            return cls(joblib.load(path), candidate_path=path)
+        except Exception as e:
+            print(f"Candidate model not loaded: {e}")
+            return None
+
+    def use_candidate(self):
+        """Decide whether this request is served by the canary"""
+        return self.canary_weight > 0 and random.random() < self.canary_weight
+
+    def record_served(self, model, latency):
+        """Record the latency of a request served by production or the canary"""
+        with self._lock:
+            if model == "candidate":
+                self.canary_requests += 1
+                self._canary_latency.append(latency)
+            else:
+                self.production_requests += 1
+                self._production_latency.append(latency)
+
+    def record_canary_error(self):
+        """Count a canary request that fell back to production"""
+        with self._lock:
+            self.canary_errors += 1
+
+    def submit(self, input_data, production_probability):
+        """Queue a production request for shadow scoring without blocking"""
+        try:
+            self._queue.put_nowait((dict(input_data), production_probability))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker_loop(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._score(batch)
+            except Exception as e:
+                print(f"Shadow scoring error: {e}")
+                with self._lock:
+                    self.errors += len(batch)
+
+    def _score(self, batch):
+        df = pd.DataFrame([input_data for input_data, _ in batch])
+        start = time.perf_counter()
+        probabilities = self.candidate.predict_proba(df)[:, 1]
+        batch_latency = time.perf_counter() - start
+
+        production = np.array([probability for _, probability in batch])
+        disagreements = int(np.sum((production >= 0.5) != (probabilities >= 0.5)))
+        abs_diff = float(np.abs(production - probabilities).sum())
+
+        with self._lock:
+            self.batches += 1
+            self.scored += len(batch)
+            self.disagreements += disagreements
+            self.abs_diff_total += abs_diff
+            self._candidate_batch_latency.append(batch_latency)
+
+    def stats(self):
+        with self._lock:
+            scored = self.scored
+            return {
+                "candidate_model": self.candidate_path,
+                "canary_weight": self.canary_weight,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "scored": scored,
+                "errors": self.errors,
+                "mean_batch_size": round(scored / self.batches, 2) if self.batches else None,
+                "disagreement_rate": round(self.disagreements / scored, 4) if scored else None,
+                "mean_abs_probability_diff": round(self.abs_diff_total / scored, 4) if scored else None,
+                "requests": {"production": self.production_requests, "canary": self.canary_requests},
+                "canary_errors": self.canary_errors,
+                "latency": {
+                    "production": _latency_summary(list(self._production_latency)),
+                    "canary": _latency_summary(list(self._canary_latency)),
+                    # Whole micro-batches of mean_batch_size rows; not comparable with the single-row figures
+                    "candidate_shadow_batch": _latency_summary(list(self._candidate_batch_latency))
+                }
+            }
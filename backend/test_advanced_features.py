@@ -1,5 +1,6 @@
 import requests
 import json
+import time
 
 # Test data based on the dataset schema
 test_data = {
@@ -92,6 +93,29 @@ def test_what_if_analysis():
         print(f"❌ What-if analysis test failed: {e}")
         return False
 
+def test_what_if_stream():
+    """Test streaming what-if analysis endpoint"""
+    try:
+        response = requests.post(
+            "http://127.0.0.1:5000/api/what-if?stream=1",
+            json={
+                "input_data": test_data,
+                "feature_name": "income_annum",
+                "min_val": 1000000,
+                "max_val": 10000000,
+                "steps": 10
+            },
+            headers={"Content-Type": "application/json"},
+            stream=True
+        )
+        events = [line for line in response.iter_lines(decode_unicode=True) if line.startswith("event:")]
+        print("✅ Streaming what-if test passed")
+        print(f"Streamed points: {events.count('event: point')}")
+        return True
+    except Exception as e:
+        print(f"❌ Streaming what-if test failed: {e}")
+        return False
+
 def test_analytics_summary():
     """Test analytics summary endpoint"""
     try:
@@ -117,6 +141,93 @@ def test_history():
         print(f"❌ History test failed: {e}")
         return False
 
+def test_conditional_requests():
+    """Test ETag revalidation and compression on cached endpoints"""
+    try:
+        for endpoint in ["feature-importance", "analytics/summary"]:
+            url = f"http://127.0.0.1:5000/api/{endpoint}"
+            response = requests.get(url, headers={"Accept-Encoding": "gzip"})
+            etag = response.headers.get("ETag")
+            revalidated = requests.get(url, headers={"If-None-Match": etag})
+            print(f"{endpoint}: ETag {etag}, encoding {response.headers.get('Content-Encoding')}, "
+                  f"revalidation status {revalidated.status_code}")
+            # Bodies below COMPRESSION_MIN_SIZE (1 KB by default) are sent uncompressed
+            if len(response.content) >= 1024 and response.headers.get("Content-Encoding") != "gzip":
+                print(f"❌ Conditional requests test failed: {endpoint} response was not gzip-encoded")
+                return False
+            if revalidated.status_code != 304:
+                print(f"❌ Conditional requests test failed: {endpoint} revalidation returned "
+                      f"{revalidated.status_code}, expected 304")
+                return False
+        print("✅ Conditional requests test passed")
+        return True
+    except Exception as e:
+        print(f"❌ Conditional requests test failed: {e}")
+        return False
+
+def test_serialization_metrics():
+    """Test columnar responses and serialization metrics"""
+    try:
+        response = requests.get("http://127.0.0.1:5000/api/history?format=columnar")
+        print(f"Columnar history format: {response.json().get('predictions', {}).get('format')}")
+        response = requests.get("http://127.0.0.1:5000/api/metrics/serialization")
+        data = response.json()
+        print("✅ Serialization metrics test passed")
+        print(f"Encoder: {data.get('encoder')}, endpoints timed: {len(data.get('endpoints', {}))}")
+        return True
+    except Exception as e:
+        print(f"❌ Serialization metrics test failed: {e}")
+        return False
+
+def test_admission_stats():
+    """Test admission control counters"""
+    try:
+        response = requests.get("http://127.0.0.1:5000/api/admission")
+        data = response.json()
+        print("✅ Admission stats test passed")
+        print(f"Heavy pool: {data.get('pools', {}).get('heavy')}")
+        return True
+    except Exception as e:
+        print(f"❌ Admission stats test failed: {e}")
+        return False
+
+def test_drift_monitoring():
+    """Test drift monitoring endpoint"""
+    try:
+        response = requests.get("http://127.0.0.1:5000/api/monitoring/drift")
+        data = response.json()
+        print("✅ Drift monitoring test passed")
+        print(f"Drift status: {data.get('status')}, max PSI: {data.get('max_psi')}")
+        return True
+    except Exception as e:
+        print(f"❌ Drift monitoring test failed: {e}")
+        return False
+
+def test_portfolio_scenario():
+    """Test portfolio scenario simulation endpoint"""
+    try:
+        response = requests.post(
+            "http://127.0.0.1:5000/api/scenarios",
+            json={
+                "source": "csv",
+                "csv_path": "loan_approval_dataset.csv",
+                "transforms": [{"feature": "cibil_score", "op": "add", "value": -50}]
+            },
+            headers={"Content-Type": "application/json"}
+        )
+        job_id = response.json().get("job_id")
+        for _ in range(60):
+            data = requests.get(f"http://127.0.0.1:5000/api/scenarios/{job_id}").json()
+            if data.get("status") in ("completed", "failed"):
+                break
+            time.sleep(0.5)
+        print("✅ Portfolio scenario test passed")
+        print(f"Scenario status: {data.get('status')}, overall: {(data.get('result') or {}).get('overall')}")
+        return True
+    except Exception as e:
+        print(f"❌ Portfolio scenario test failed: {e}")
+        return False
+
 if __name__ == "__main__":
     print("Testing Advanced Loan Approval API Features...")
     print("=" * 60)
@@ -127,8 +238,14 @@ if __name__ == "__main__":
         ("Feature Importance", test_feature_importance),
         ("Recommendations", test_recommendations),
         ("What-If Analysis", test_what_if_analysis),
+        ("Streaming What-If", test_what_if_stream),
         ("Analytics Summary", test_analytics_summary),
-        ("History", test_history)
+        ("History", test_history),
+        ("Conditional Requests", test_conditional_requests),
+        ("Serialization Metrics", test_serialization_metrics),
+        ("Admission Stats", test_admission_stats),
+        ("Drift Monitoring", test_drift_monitoring),
+        ("Portfolio Scenario", test_portfolio_scenario)
     ]
     
     passed = 0
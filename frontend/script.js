@@ -5,6 +5,156 @@ let charts = {};
 // API Base URL
 const API_BASE = "http://127.0.0.1:5000/api";
 
+// Request layer: debounces interactions, cancels superseded requests and
+// caches responses by payload hash
+const RESPONSE_CACHE_SIZE = 50;
+const INTERACTION_DEBOUNCE_MS = 300;
+const responseCache = new Map();
+const pendingRequests = new Map();
+const activeControllers = {};
+const debounceTimers = {};
+
+// FNV-1a hash of a request payload
+function hashPayload(text) {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return (hash >>> 0).toString(16);
+}
+
+function getCachedResponse(key) {
+  if (!responseCache.has(key)) return null;
+  // Refresh recency so the cache evicts least recently used entries
+  const value = responseCache.get(key);
+  responseCache.delete(key);
+  responseCache.set(key, value);
+  return value;
+}
+
+function cacheResponse(key, value) {
+  responseCache.set(key, value);
+  if (responseCache.size > RESPONSE_CACHE_SIZE) {
+    responseCache.delete(responseCache.keys().next().value);
+  }
+}
+
+// Abort the in-flight request on a channel and register a new one
+function startChannelRequest(channel) {
+  if (activeControllers[channel]) {
+    activeControllers[channel].abort();
+  }
+  const controller = new AbortController();
+  activeControllers[channel] = controller;
+  return controller;
+}
+
+// Abort whatever is in flight on a channel, e.g. before serving from cache
+function cancelChannelRequest(channel) {
+  if (activeControllers[channel]) {
+    activeControllers[channel].abort();
+    delete activeControllers[channel];
+  }
+}
+
+function finishChannelRequest(channel, controller) {
+  if (activeControllers[channel] === controller) {
+    delete activeControllers[channel];
+  }
+}
+
+function isAbortError(error) {
+  return error && error.name === "AbortError";
+}
+
+// POST a JSON payload on a channel. A newer request on the same channel
+// aborts the older one, identical in-flight payloads share one request,
+// and successful responses are served from cache on repeat. Cache and
+// shared hits also abort any other request on the channel, so a slower
+// older response cannot replace the newer result.
+async function postJSON(channel, path, payload) {
+  const body = JSON.stringify(payload);
+  const key = `${path}:${hashPayload(body)}`;
+
+  const cached = getCachedResponse(key);
+  if (cached) {
+    cancelChannelRequest(channel);
+    return cached;
+  }
+  const pending = pendingRequests.get(key);
+  if (pending && !pending.controller.signal.aborted) {
+    if (activeControllers[channel] !== pending.controller) {
+      cancelChannelRequest(channel);
+      activeControllers[channel] = pending.controller;
+    }
+    return pending.request;
+  }
+
+  const controller = startChannelRequest(channel);
+  const request = fetch(`${API_BASE}${path}`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body,
+    signal: controller.signal,
+  })
+    .then(async (response) => {
+      const result = { ok: response.ok, data: await response.json() };
+      if (response.ok) cacheResponse(key, result);
+      return result;
+    })
+    .finally(() => {
+      if (pendingRequests.get(key)?.request === request) {
+        pendingRequests.delete(key);
+      }
+      finishChannelRequest(channel, controller);
+    });
+
+  pendingRequests.set(key, { request, controller });
+  return request;
+}
+
+// Run fn once interactions on a channel have paused for delay ms
+function debounce(channel, fn, delay = INTERACTION_DEBOUNCE_MS) {
+  clearTimeout(debounceTimers[channel]);
+  debounceTimers[channel] = setTimeout(fn, delay);
+}
+
+function cancelDebounce(channel) {
+  clearTimeout(debounceTimers[channel]);
+  delete debounceTimers[channel];
+}
+
+// Parse a server-sent event stream from a fetch response, calling
+// onEvent(event, data) for each event as it arrives
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      block.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      });
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
 // Initialize the application
 document.addEventListener("DOMContentLoaded", function () {
   initializeNavigation();
@@ -63,7 +213,18 @@ function initializeEventListeners() {
   // What-if analysis
   const runWhatIfBtn = document.getElementById("runWhatIf");
   if (runWhatIfBtn) {
-    runWhatIfBtn.addEventListener("click", runWhatIfAnalysis);
+    runWhatIfBtn.addEventListener("click", () => {
+      cancelDebounce("whatif");
+      runWhatIfAnalysis();
+    });
+  }
+
+  // Re-run the sweep when the feature changes, once the user settles
+  const whatifFeature = document.getElementById("whatifFeature");
+  if (whatifFeature) {
+    whatifFeature.addEventListener("change", () => {
+      if (currentPredictionData) debounce("whatif", runWhatIfAnalysis);
+    });
   }
 
   // Recommendations
@@ -79,6 +240,8 @@ function initializeEventListeners() {
   );
   if (targetProbabilitySlider && targetProbabilityValue) {
     targetProbabilitySlider.addEventListener("input", (e) => {
+      // Recommendations are expensive and rate limited, so the slider only
+      // updates the label; the button fetches them
       targetProbabilityValue.textContent = `${(e.target.value * 100).toFixed(
         0
       )}%`;
@@ -279,34 +442,77 @@ async function runWhatIfAnalysis() {
 
   const [minVal, maxVal] = ranges[selectedFeature] || [0, 100];
 
+  const payload = {
+    input_data: currentPredictionData,
+    feature_name: selectedFeature,
+    min_val: minVal,
+    max_val: maxVal,
+    steps: 20,
+  };
+  const key = `/what-if:${hashPayload(JSON.stringify(payload))}`;
+
+  // Repeat sweeps are drawn straight from cache
+  const cached = getCachedResponse(key);
+  if (cached) {
+    // Stop any sweep still streaming so its points do not land on this chart
+    cancelChannelRequest("whatif");
+    createWhatIfChart(cached.data);
+    return;
+  }
+
+  const controller = startChannelRequest("whatif");
+
   try {
-    const response = await fetch(`${API_BASE}/what-if`, {
+    const response = await fetch(`${API_BASE}/what-if?stream=1`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
       },
-      body: JSON.stringify({
-        input_data: currentPredictionData,
-        feature_name: selectedFeature,
-        min_val: minVal,
-        max_val: maxVal,
-        steps: 20,
-      }),
+      body: JSON.stringify(payload),
+      signal: controller.signal,
     });
 
-    const result = await response.json();
-
-    if (response.ok) {
-      createWhatIfChart(result);
-    } else {
+    if (!response.ok) {
+      const result = await response.json();
       alert(`Error: ${result.error}`);
+      return;
     }
+
+    // Draw the chart as soon as the first points are scored
+    let result = null;
+    await readEventStream(response, (event, data) => {
+      // Events already buffered when a newer sweep aborted this one are dropped
+      if (controller.signal.aborted) return;
+      if (event === "meta") {
+        result = { ...data, results: [] };
+        createWhatIfChart(result);
+      } else if (event === "point") {
+        result.results.push(data);
+        appendWhatIfPoint(data);
+      } else if (event === "done") {
+        cacheResponse(key, { ok: true, data: result });
+      } else if (event === "error") {
+        alert(`Error: ${data.error}`);
+      }
+    });
   } catch (error) {
+    if (isAbortError(error)) return;
     alert("Error running What-If Analysis");
     console.error(error);
+  } finally {
+    finishChannelRequest("whatif", controller);
   }
 }
 
+// Add a streamed sweep point to the what-if chart
+function appendWhatIfPoint(point) {
+  if (!charts.whatif) return;
+
+  charts.whatif.data.labels.push(point.value);
+  charts.whatif.data.datasets[0].data.push(point.probability * 100);
+  charts.whatif.update("none");
+}
+
 // Create what-if analysis chart
 function createWhatIfChart(data) {
   const ctx = document.getElementById("whatifChart");
@@ -431,25 +637,24 @@ async function getRecommendations() {
   );
 
   try {
-    const response = await fetch(`${API_BASE}/recommendations`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify({
+    const { ok, data: result } = await postJSON(
+      "recommendations",
+      "/recommendations",
+      {
         ...currentPredictionData,
         target_probability: targetProbability,
-      }),
-    });
-
-    const result = await response.json();
+      }
+    );
 
-    if (response.ok) {
+    if (ok) {
       displayRecommendations(result.recommendations);
+    } else if (result.retry_after) {
+      alert(`Too many requests, please try again in ${Math.ceil(result.retry_after)}s`);
     } else {
       alert(`Error: ${result.error}`);
     }
   } catch (error) {
+    if (isAbortError(error)) return;
     alert("Error getting recommendations");
     console.error(error);
   }
@@ -542,6 +747,28 @@ function displayModelMetrics(metrics) {
             )}%</div>
             <div class="metric-label">Test Accuracy</div>
         </div>
+        ${displayServingProfile(metrics.serving_profile)}
+    `;
+}
+
+// Display serving cost of the selected model
+function displayServingProfile(profile) {
+  if (!profile) return "";
+
+  return `
+        <div class="metric-item">
+            <div class="metric-value">${profile.single_row_latency.p95_ms.toFixed(
+              1
+            )} ms</div>
+            <div class="metric-label">p95 Prediction Latency</div>
+        </div>
+        <div class="metric-item">
+            <div class="metric-value">${(
+              profile.serialized_size_bytes /
+              (1024 * 1024)
+            ).toFixed(1)} MB</div>
+            <div class="metric-label">Model Size</div>
+        </div>
     `;
 }
 